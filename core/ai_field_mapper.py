@@ -14,6 +14,7 @@ import os
 import json
 import logging
 import re
+import pandas as pd
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 from dotenv import load_dotenv
@@ -46,6 +47,35 @@ class DataValidation:
 class AIFieldMapper:
     """AI-powered field mapping and data validation system."""
 
+    # Rule-based mapping rules, in priority order (the first matching rule wins)
+    MAPPING_RULES = [
+        # Name fields
+        (r'cliente|customer|nome|name|last.*name|lead', 'Last Name'),
+        # Phone fields
+        (r'telefone|phone|tel|celular|mobile', 'Phone'),
+        (r'telefone.*adicional|additional.*phone|phone.*2', 'Telefone Adcional'),
+        # Email fields
+        (r'e-?mail|email', 'Email'),
+        # Financial fields
+        (r'volume|patrimonio|patrimônio|financial|valor|value', 'Patrimônio Financeiro'),
+        # Location fields
+        (r'estado|state|province|provincia', 'State/Province'),
+        # Description fields
+        (r'descri[çc][aã]o|description|obs|observa[çc][aã]o', 'Description'),
+        # Owner fields
+        (r'alias|owner|respons[aá]vel|vendedor|atribuir', 'OwnerId'),
+        # Type fields
+        (r'tipo|type|categoria|category', 'Tipo'),
+    ]
+
+    # All rules compiled into one alternation. Each branch scans the whole
+    # name from the start, so the branches are tried in rule order and the
+    # named group that matched identifies the winning rule.
+    MAPPING_RULES_PATTERN = re.compile(
+        '|'.join(f'(?P<rule{i}>.*?(?:{pattern}))' for i, (pattern, _) in enumerate(MAPPING_RULES)),
+        re.DOTALL
+    )
+
     def __init__(self, config: Dict[str, Any] = None):
         """Initialize the AI field mapper."""
         self.logger = logging.getLogger(__name__)
@@ -219,39 +249,15 @@ Respond with valid JSON only.
         """Fallback rule-based mapping when AI is not available."""
         self.logger.info("Using rule-based column mapping")
 
-        # Define mapping rules
-        mapping_rules = {
-            # Name fields
-            r'cliente|customer|nome|name|last.*name|lead': 'Last Name',
-            # Phone fields
-            r'telefone|phone|tel|celular|mobile': 'Phone',
-            r'telefone.*adicional|additional.*phone|phone.*2': 'Telefone Adcional',
-            # Email fields
-            r'e-?mail|email': 'Email',
-            # Financial fields
-            r'volume|patrimonio|patrimônio|financial|valor|value': 'Patrimônio Financeiro',
-            # Location fields
-            r'estado|state|province|provincia': 'State/Province',
-            # Description fields
-            r'descri[çc][aã]o|description|obs|observa[çc][aã]o': 'Description',
-            # Owner fields
-            r'alias|owner|respons[aá]vel|vendedor|atribuir': 'OwnerId',
-            # Type fields
-            r'tipo|type|categoria|category': 'Tipo'
-        }
-
         mappings = []
         for col_name in column_names:
             best_match = None
             best_confidence = 0.0
 
-            col_lower = col_name.lower()
-            for pattern, target_field in mapping_rules.items():
-                if re.search(pattern, col_lower):
-                    confidence = 85.0  # High confidence for rule-based matches
-                    if confidence > best_confidence:
-                        best_match = target_field
-                        best_confidence = confidence
+            match = self.MAPPING_RULES_PATTERN.match(col_name.lower())
+            if match:
+                best_match = self.MAPPING_RULES[int(match.lastgroup[len('rule'):])][1]
+                best_confidence = 85.0  # High confidence for rule-based matches
 
             if best_match:
                 mapping = FieldMapping(
@@ -276,13 +282,13 @@ Respond with valid JSON only.
 
         return mappings
 
-    def validate_data_quality(self, field_name: str, data_samples: List[str], target_field: str = None) -> DataValidation:
+    def validate_data_quality(self, field_name: str, data_samples: Any, target_field: str = None) -> DataValidation:
         """
         Use AI to validate data quality and suggest improvements.
 
         Args:
             field_name: Name of the field being validated
-            data_samples: Sample data from the field
+            data_samples: Sample data from the field (list, pandas Series or array)
             target_field: Target field this data will be mapped to
 
         Returns:
@@ -292,7 +298,7 @@ Respond with valid JSON only.
             return self._rule_based_validation(field_name, data_samples, target_field)
 
         try:
-            return self._ai_powered_validation(field_name, data_samples, target_field)
+            return self._ai_powered_validation(field_name, list(data_samples), target_field)
         except Exception as e:
             self.logger.error(f"AI validation failed, falling back to rule-based: {e}")
             return self._rule_based_validation(field_name, data_samples, target_field)
@@ -389,25 +395,18 @@ Respond with valid JSON only.
         issues = []
         suggestions = []
 
-        if not data_samples:
+        samples = pd.Series(data_samples, dtype=object).reset_index(drop=True)
+        if samples.empty:
             issues.append("No data samples provided")
             return DataValidation(field_name, issues, suggestions, 0.0, [])
 
-        # Remove empty/null values for analysis - handle pandas Series safely
-        valid_samples = []
-        for s in data_samples:
-            try:
-                # Convert to string safely
-                s_str = str(s) if s is not None else ''
-                # Check if it's a valid non-empty value
-                if s is not None and s_str.strip() and s_str.lower() not in ['nan', 'null', 'none', 'nat']:
-                    valid_samples.append(s)
-            except (ValueError, TypeError):
-                # Skip problematic values
-                continue
-
-        if len(valid_samples) < len(data_samples) * 0.5:
-            issues.append(f"High percentage of empty values: {len(data_samples) - len(valid_samples)}/{len(data_samples)}")
+        # Remove empty/null values for analysis with whole-column masks
+        text = samples.astype(str).str.strip()
+        valid = samples.notna() & text.ne('') & ~text.str.lower().isin(['nan', 'null', 'none', 'nat'])
+        valid_samples = samples[valid].tolist()
+
+        if len(valid_samples) < len(samples) * 0.5:
+            issues.append(f"High percentage of empty values: {len(samples) - len(valid_samples)}/{len(samples)}")
             suggestions.append("Consider data cleaning to handle missing values")
 
         # Field-specific validation
@@ -433,7 +432,7 @@ Respond with valid JSON only.
             issues_found=issues,
             suggestions=suggestions,
             confidence=confidence,
-            sample_data=data_samples[:5]
+            sample_data=samples.head(5).tolist()
         )
 
     def _validate_phone_data(self, samples: List[str]) -> Tuple[List[str], List[str]]:
@@ -499,6 +498,11 @@ Respond with valid JSON only.
 
         return issues, suggestions
 
+    @staticmethod
+    def get_mappings_by_source(mappings: List[FieldMapping]) -> Dict[str, FieldMapping]:
+        """Index mapping results by source column."""
+        return {m.source_field: m for m in mappings}
+
     def get_mapping_summary(self, mappings: List[FieldMapping]) -> Dict[str, Any]:
         """Generate a summary of mapping results."""
         high_confidence = [m for m in mappings if m.confidence >= self.confidence_threshold]
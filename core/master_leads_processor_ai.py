@@ -15,21 +15,58 @@ Date: 2024
 """
 
 import pandas as pd
+import copy
 import re
 import os
 import sys
 import logging
 import json
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
 
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import the AI field mapper
 from ai_field_mapper import AIFieldMapper, FieldMapping, DataValidation
 
+@lru_cache(maxsize=32)
+def _read_config_file(config_file: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a JSON config file once; the stat fields invalidate stale entries."""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 class AIEnhancedLeadsProcessor:
     """AI-Enhanced leads processor with intelligent field mapping and validation."""
 
+    # Concatenated capitalized words ("ModeradoRegular"), compiled once and
+    # matched with RE2's linear-time engine when it is installed
+    CONCATENATED_WORDS_PATTERN = (re2 if RE2_AVAILABLE else re).compile(
+        r'([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)'
+    )
+
+    # The same split as a single pass: each word followed by another one gets
+    # the separator. The lookahead needs the standard re engine (RE2 has none).
+    CONCATENATED_WORDS_SPLIT_PATTERN = re.compile(
+        r'([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)(?=[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç])'
+    )
+
+    # Phone and money cleaning patterns, compiled once
+    NON_DIGITS_PATTERN = re.compile(r'[^0-9]')
+    CURRENCY_FORMATTING_PATTERN = re.compile(r'[R$BRL\s,.]')
+    DIGITS_PATTERN = re.compile(r'(\d+)')
+
     def __init__(self, config_file: str = None):
         """Initialize the AI-enhanced processor with configuration."""
         self.setup_logging()
@@ -100,8 +137,9 @@ class AIEnhancedLeadsProcessor:
 
         if config_file and os.path.exists(config_file):
             try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    user_config = json.load(f)
+                stat = os.stat(config_file)
+                # The parse is shared between processors, so merge a private copy
+                user_config = copy.deepcopy(_read_config_file(config_file, stat.st_mtime_ns, stat.st_size))
                 # Deep merge configurations
                 self._deep_merge_config(default_config, user_config)
                 self.logger.info(f"Loaded configuration from {config_file}")
@@ -269,14 +307,14 @@ class AIEnhancedLeadsProcessor:
                     low_confidence_mappings.append(mapping)
                     self.logger.warning(f"Low confidence mapping: {mapping.source_field} → {mapping.target_field} ({mapping.confidence}%)")
 
-            # Apply mappings
-            df_mapped = df.rename(columns=mapping_dict)
-
             # Handle low confidence mappings (could prompt user in interactive mode)
+            renames = dict(mapping_dict)
             for mapping in low_confidence_mappings:
-                if mapping.source_field in df_mapped.columns:
-                    self.logger.info(f"Applying low confidence mapping: {mapping.source_field} → {mapping.target_field}")
-                    df_mapped = df_mapped.rename(columns={mapping.source_field: mapping.target_field})
+                self.logger.info(f"Applying low confidence mapping: {mapping.source_field} → {mapping.target_field}")
+                renames[mapping.source_field] = mapping.target_field
+
+            # Apply all mappings in a single rename
+            df_mapped = df.rename(columns=renames)
 
             # Add missing standard columns with default values
             for col in self.standard_columns:
@@ -413,7 +451,7 @@ class AIEnhancedLeadsProcessor:
         # Convert to string and remove decimal points
         phone_str = str(phone).replace('.0', '')
         # Remove any non-digit characters
-        cleaned = re.sub(r'[^0-9]', '', phone_str)
+        cleaned = self.NON_DIGITS_PATTERN.sub('', phone_str)
         return cleaned
 
     def format_name_ai(self, name: Any) -> str:
@@ -468,6 +506,28 @@ class AIEnhancedLeadsProcessor:
 
         return email.lower().strip()
 
+    def clean_phone_series(self, phones: pd.Series) -> pd.Series:
+        """
+        Vectorized version of clean_phone_number_ai for a whole column.
+        Missing values become empty strings and every other value keeps only its digits.
+        """
+        missing = phones.isna()
+        cleaned = (phones.astype(str)
+                   .str.replace('.0', '', regex=False)
+                   .str.replace(self.NON_DIGITS_PATTERN, '', regex=True))
+        return cleaned.mask(missing, '')
+
+    def format_email_series(self, emails: pd.Series) -> pd.Series:
+        """
+        Vectorized version of format_email_ai for a whole column.
+        Missing values become empty strings, text is lowercased and stripped, and
+        any other value is only converted to a string.
+        """
+        missing = emails.isna()
+        is_text = emails.map(lambda value: isinstance(value, str)).astype(bool)
+        formatted = emails.astype(str)
+        return formatted.where(~is_text, formatted.str.lower().str.strip()).mask(missing, '')
+
     def format_description_ai(self, description: Any) -> str:
         """
         AI-enhanced description formatting with automatic semicolon insertion.
@@ -496,10 +556,15 @@ class AIEnhancedLeadsProcessor:
         if not description:
             return ''
 
-        # Pattern to match concatenated capitalized words
-        # Looks for: Capital letter followed by lowercase letters, then another capital letter
-        pattern = r'([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)'
+        return self._split_concatenated_words(description)
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _split_concatenated_words(description: str) -> str:
+        """
+        Separate concatenated capitalized words with semicolons. Memoized, since
+        the same few descriptions ("ModeradoRegular") recur across leads.
+        """
         # Keep applying the pattern until no more matches are found
         formatted = description
         max_iterations = 10  # Prevent infinite loops
@@ -507,7 +572,7 @@ class AIEnhancedLeadsProcessor:
 
         while iteration < max_iterations:
             # Find all matches of concatenated words - using semicolon separator
-            new_formatted = re.sub(pattern, r'\1; \2', formatted)
+            new_formatted = AIEnhancedLeadsProcessor.CONCATENATED_WORDS_PATTERN.sub(r'\1; \2', formatted)
 
             # If no changes were made, we're done
             if new_formatted == formatted:
@@ -518,6 +583,20 @@ class AIEnhancedLeadsProcessor:
 
         return formatted
 
+    def format_description_series(self, descriptions: pd.Series) -> pd.Series:
+        """
+        Vectorized version of format_description_ai for a whole column.
+        Missing values become empty strings and every other value is
+        formatted the same way as format_description_ai. Each distinct
+        description is formatted once and then spread back over the rows.
+        """
+        codes, uniques = pd.factorize(descriptions)
+        formatted = (pd.Series(uniques, dtype=object).astype(str).str.strip()
+                     .str.replace(self.CONCATENATED_WORDS_SPLIT_PATTERN, r'\1; ', regex=True))
+        # Missing values have code -1 and pick up the trailing empty string
+        formatted = pd.concat([formatted, pd.Series([''])], ignore_index=True).to_numpy()
+        return pd.Series(formatted[codes], index=descriptions.index, name=descriptions.name)
+
     def convert_money_to_numeric(self, value: Any) -> int:
         """AI-enhanced money conversion."""
         # Handle pandas Series or individual values
@@ -539,7 +618,7 @@ class AIEnhancedLeadsProcessor:
             # Handle different currency formats
             if "R$" in value_str or "BRL" in value_str:
                 # Remove currency symbols and formatting
-                value_str = re.sub(r'[R$BRL\s,.]', '', value_str)
+                value_str = self.CURRENCY_FORMATTING_PATTERN.sub('', value_str)
                 try:
                     return int(value_str) if value_str.isdigit() else self.config["default_values"]["patrimonio_financeiro"]
                 except ValueError:
@@ -548,18 +627,58 @@ class AIEnhancedLeadsProcessor:
             # Handle "million" indicators
             if "MILHAO" in value_str or "MILLION" in value_str or "M" in value_str:
                 # Extract numeric part
-                numeric_part = re.search(r'(\d+)', value_str)
+                numeric_part = self.DIGITS_PATTERN.search(value_str)
                 if numeric_part:
                     return int(numeric_part.group(1)) * 1000000
 
             # Try to extract any numeric value
-            numeric_match = re.search(r'(\d+)', value_str)
+            numeric_match = self.DIGITS_PATTERN.search(value_str)
             if numeric_match:
                 return int(numeric_match.group(1))
 
         # Default value
         return self.config["default_values"]["patrimonio_financeiro"]
 
+    def money_series_to_numeric(self, values: pd.Series) -> pd.Series:
+        """
+        Vectorized version of convert_money_to_numeric for a whole column.
+        Missing or unparseable values become the configured default. Digits are
+        converted with Python ints, so large values stay exact; a value that does
+        not fit in int64 keeps the column as object dtype, as the per-value
+        converter would.
+        """
+        default = self.config["default_values"]["patrimonio_financeiro"]
+        result = pd.Series(default, index=values.index, dtype=object)
+
+        is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+        is_number = values.notna() & ~is_text
+
+        # Numbers are truncated to integers
+        numbers = values[is_number]
+        result[is_number] = pd.Series([int(value) for value in numbers], index=numbers.index, dtype=object)
+
+        # Text takes its first run of digits
+        text = values[is_text].astype(str).str.upper()
+        digits = text.str.extract(self.DIGITS_PATTERN, expand=False)
+
+        # Currency values keep only their digits, or fall back to the default
+        currency = text.str.contains('R$', regex=False) | text.str.contains('BRL', regex=False)
+        currency_digits = text.str.replace(self.CURRENCY_FORMATTING_PATTERN, '', regex=True)
+        digits = digits.where(~currency, currency_digits.where(currency_digits.str.isdigit()))
+
+        # Other values are scaled for "million" indicators
+        # Built as object so pandas does not infer float64 around the missing values
+        parsed = pd.Series([None if pd.isna(value) else int(value) for value in digits],
+                           index=digits.index, dtype=object)
+        millions = text.str.contains('M', regex=False) & ~currency
+        parsed = parsed.where(~millions, parsed * 1000000)
+
+        result[is_text] = parsed.where(parsed.notna(), default)
+        try:
+            return result.astype('int64')
+        except OverflowError:
+            return result
+
     def clean_and_format_data_ai(self, df: pd.DataFrame, validations: Dict[str, DataValidation] = None) -> pd.DataFrame:
         """AI-enhanced data cleaning and formatting."""
         self.logger.info("AI-enhanced data cleaning and formatting")
@@ -568,9 +687,9 @@ class AIEnhancedLeadsProcessor:
 
         # Clean phone numbers
         if 'Phone' in df_clean.columns:
-            df_clean['Phone'] = df_clean['Phone'].apply(self.clean_phone_number_ai)
+            df_clean['Phone'] = self.clean_phone_series(df_clean['Phone'])
         if 'Telefone Adcional' in df_clean.columns:
-            df_clean['Telefone Adcional'] = df_clean['Telefone Adcional'].apply(self.clean_phone_number_ai)
+            df_clean['Telefone Adcional'] = self.clean_phone_series(df_clean['Telefone Adcional'])
 
         # Format names with cultural awareness
         if 'Last Name' in df_clean.columns:
@@ -578,18 +697,15 @@ class AIEnhancedLeadsProcessor:
 
         # Format emails
         if 'Email' in df_clean.columns:
-            df_clean['Email'] = df_clean['Email'].apply(self.format_email_ai)
+            df_clean['Email'] = self.format_email_series(df_clean['Email'])
 
         # Format descriptions with semicolon separation for concatenated words (Salesforce CSV compatible)
         if 'Description' in df_clean.columns:
-            df_clean['Description'] = df_clean['Description'].apply(self.format_description_ai)
+            df_clean['Description'] = self.format_description_series(df_clean['Description'])
 
         # Handle financial data
         if 'Patrimônio Financeiro' in df_clean.columns:
-            # Apply conversion safely to avoid Series ambiguity
-            df_clean['Patrimônio Financeiro'] = df_clean['Patrimônio Financeiro'].apply(
-                lambda x: self.convert_money_to_numeric(x)
-            )
+            df_clean['Patrimônio Financeiro'] = self.money_series_to_numeric(df_clean['Patrimônio Financeiro'])
 
         # Apply AI suggestions from validations if available
         if validations:
@@ -808,14 +924,26 @@ class AIEnhancedLeadsProcessor:
         summary_file = f"{Path(output_file).stem}_ai_summary.json"
         summary_path = Path(output_file).parent / summary_file
 
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        self._write_summary_json(summary, summary_path)
 
         self.logger.info(f"AI processing summary saved to: {summary_path}")
 
         # Print summary to console
         self._print_ai_summary(summary)
 
+    def _write_summary_json(self, summary: Dict[str, Any], summary_path: Path):
+        """Write the summary as indented UTF-8 JSON, using orjson's encoder when installed."""
+        if ORJSON_AVAILABLE:
+            try:
+                summary_path.write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+                return
+            except TypeError:
+                # Values orjson cannot encode (e.g. NumPy scalars) go through json
+                pass
+
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
     def _print_ai_summary(self, summary: Dict[str, Any]):
         """Print AI processing summary to console."""
         print("\n" + "="*70)
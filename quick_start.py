@@ -8,26 +8,44 @@ import sys
 import os
 from pathlib import Path
 
+USAGE = """\
+🚀 Sistema de Processamento de Leads
+========================================
+
+COMANDOS DISPONÍVEIS:
+
+1. Processar arquivo com IA:
+   python quick_start.py ai arquivo.xlsx
+
+2. Processar arquivo tradicional:
+   python quick_start.py process arquivo.csv
+
+3. Validar arquivo:
+   python quick_start.py validate arquivo.csv
+
+4. Configurar sistema:
+   python quick_start.py setup
+
+5. Testar sistema:
+   python quick_start.py test
+"""
+
 def show_usage():
-    print("🚀 Sistema de Processamento de Leads")
-    print("=" * 40)
-    print()
-    print("COMANDOS DISPONÍVEIS:")
-    print()
-    print("1. Processar arquivo com IA:")
-    print("   python quick_start.py ai arquivo.xlsx")
-    print()
-    print("2. Processar arquivo tradicional:")
-    print("   python quick_start.py process arquivo.csv")
-    print()
-    print("3. Validar arquivo:")
-    print("   python quick_start.py validate arquivo.csv")
-    print()
-    print("4. Configurar sistema:")
-    print("   python quick_start.py setup")
-    print()
-    print("5. Testar sistema:")
-    print("   python quick_start.py test")
+    sys.stdout.write(USAGE)
+
+def run_script(script, *args):
+    """Replace the current process with one of the project scripts."""
+    cmd = [sys.executable, script, *args]
+    if os.name == 'nt':
+        # On Windows os.exec* spawns a new process and exits immediately,
+        # which would hand the console back while the script still runs
+        import subprocess
+        sys.exit(subprocess.call(cmd))
+    try:
+        os.execv(sys.executable, cmd)
+    except OSError as e:
+        print(f"❌ Não foi possível executar {script}: {e}")
+        sys.exit(1)
 
 def main():
     if len(sys.argv) < 2:
@@ -37,22 +55,19 @@ def main():
     command = sys.argv[1].lower()
     
     if command == "ai" and len(sys.argv) > 2:
-        file_path = sys.argv[2]
-        os.system(f"python core/master_leads_processor_ai.py {file_path}")
+        run_script("core/master_leads_processor_ai.py", sys.argv[2])
     
     elif command == "process" and len(sys.argv) > 2:
-        file_path = sys.argv[2]
-        os.system(f"python core/master_leads_processor.py {file_path}")
+        run_script("core/master_leads_processor.py", sys.argv[2])
     
     elif command == "validate" and len(sys.argv) > 2:
-        file_path = sys.argv[2]
-        os.system(f"python tools/data_validator.py {file_path}")
+        run_script("tools/data_validator.py", sys.argv[2])
     
     elif command == "setup":
-        os.system("python tools/setup_ai_system.py")
+        run_script("tools/setup_ai_system.py")
     
     elif command == "test":
-        os.system("python tests/test_ai_integration.py")
+        run_script("tests/test_ai_integration.py")
     
     else:
         show_usage()
@@ -0,0 +1,175 @@
+"""
+Shared pytest fixtures for the leads processor tests.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import socket
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from .helpers import EXCEL_COLUMNS, PYARROW_AVAILABLE, read_leads, read_output
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Make the core modules importable from every test module
+sys.path.insert(0, str(ROOT / "core"))
+
+# Where the sample leads spreadsheet may live, in order of preference
+EXCEL_CANDIDATES = [
+    "data/input/leads_vinteseismaio.xlsx",
+    "leads_vinteseismaio.xlsx",
+    "Leads 1m+ dia 26 de Maio.xlsx",
+]
+
+
+@pytest.fixture(autouse=True)
+def _no_network(request, monkeypatch):
+    """Refuse outbound connections so no test silently waits on the network.
+
+    Loopback and Unix sockets still work. Tests marked integration are exempt.
+    """
+    if request.node.get_closest_marker("integration"):
+        return
+
+    real_connect = socket.socket.connect
+    real_connect_ex = socket.socket.connect_ex
+
+    def is_local(sock, address):
+        host = address[0] if isinstance(address, tuple) else None
+        return sock.family == getattr(socket, "AF_UNIX", None) or host in (
+            "localhost",
+            "127.0.0.1",
+            "::1",
+        )
+
+    def guarded_connect(sock, address, *args):
+        if is_local(sock, address):
+            return real_connect(sock, address, *args)
+        raise RuntimeError(f"Network access is disabled in tests: {address}")
+
+    def guarded_connect_ex(sock, address, *args):
+        # connect_ex reports failures as an errno instead of raising
+        if is_local(sock, address):
+            return real_connect_ex(sock, address, *args)
+        return errno.ECONNREFUSED
+
+    monkeypatch.setattr(socket.socket, "connect", guarded_connect)
+    monkeypatch.setattr(socket.socket, "connect_ex", guarded_connect_ex)
+
+
+@pytest.fixture(scope="session")
+def mapper():
+    """Rule-based field mapper shared by the whole test session."""
+    from ai_field_mapper import AIFieldMapper
+
+    config = {"ai_processing": {"enabled": False, "confidence_threshold": 80.0}}
+    return AIFieldMapper(config)
+
+
+@pytest.fixture(scope="session")
+def all_mappings(mapper):
+    """Rule-based mappings of the spreadsheet columns, keyed by source column."""
+    return mapper.get_mappings_by_source(mapper._rule_based_mapping(EXCEL_COLUMNS))
+
+
+@pytest.fixture(scope="session")
+def processor():
+    """AI-enhanced processor with AI disabled, shared by the whole test session."""
+    from master_leads_processor_ai import AIEnhancedLeadsProcessor
+
+    processor = AIEnhancedLeadsProcessor()
+    processor.config["ai_processing"]["enabled"] = False
+    processor.ai_mapper.ai_enabled = False
+    return processor
+
+
+@pytest.fixture(scope="session")
+def excel_path():
+    """Path to the sample leads spreadsheet; skips the test when it is missing.
+
+    The candidate locations are probed once per session.
+    """
+    for candidate in EXCEL_CANDIDATES:
+        if Path(candidate).exists():
+            return candidate
+    pytest.skip(f"Excel file not found: {EXCEL_CANDIDATES[0]}")
+
+
+@pytest.fixture(scope="session")
+def df_original(excel_path, pytestconfig):
+    """The spreadsheet parsed once per session. Do not modify it in tests.
+
+    With pyarrow installed the parsed data is also kept as Parquet in the
+    pytest cache, keyed on the workbook's resolved path, mtime and size, so
+    later runs skip the XLSX parse until a different or changed file is used.
+    """
+    if not PYARROW_AVAILABLE or getattr(pytestconfig, "cache", None) is None:
+        return read_leads(excel_path)
+
+    workbook = Path(excel_path).resolve()
+    stat = workbook.stat()
+    digest = hashlib.sha256(f"{workbook}|{stat.st_mtime_ns}|{stat.st_size}".encode())
+    cache = (
+        Path(pytestconfig.cache.mkdir("leads")) / f"{digest.hexdigest()[:16]}.parquet"
+    )
+    if cache.exists():
+        return pd.read_parquet(cache)
+
+    import pyarrow as pa
+
+    df = read_leads(excel_path)
+    # Write beside the cache entry and rename, so parallel workers never read a partial file
+    partial = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(partial, engine="pyarrow")
+        os.replace(partial, cache)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columns mixing numbers and text cannot be stored; just skip the cache
+        if partial.exists():
+            partial.unlink()
+    return df
+
+
+@pytest.fixture
+def df(df_original):
+    """A private copy of the spreadsheet data for tests that modify it."""
+    return df_original.copy()
+
+
+@pytest.fixture(scope="session")
+def mapped(processor, df_original):
+    """(df_mapped, field_mappings) for the spreadsheet, mapped once per session."""
+    return processor.intelligent_column_mapping(df_original)
+
+
+@pytest.fixture(scope="session")
+def pipeline_output(processor, excel_path, pytestconfig, tmp_path_factory):
+    """The CSV written by the full pipeline, which runs once per session.
+
+    The CSV is kept in the pytest cache under a hash of the spreadsheet and
+    the core sources, so later runs skip the pipeline until either changes.
+    Each session writes into its own temporary directory and publishes the
+    result with an atomic rename, so parallel xdist workers never collide.
+    """
+    output_file = str(tmp_path_factory.mktemp("pipeline") / "leads_ai_processed.csv")
+    cache = getattr(pytestconfig, "cache", None)
+    if cache is None:
+        return read_output(processor.process_file_ai(excel_path, output_file))
+
+    digest = hashlib.sha256(Path(excel_path).read_bytes())
+    for source in sorted((ROOT / "core").glob("*.py")):
+        digest.update(source.read_bytes())
+    cached = Path(cache.mkdir("pipeline")) / f"{digest.hexdigest()[:16]}.csv"
+    if not cached.exists():
+        processor.process_file_ai(excel_path, output_file)
+        # Copy next to the cache entry first; os.replace cannot cross filesystems
+        partial = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+        shutil.copyfile(output_file, partial)
+        os.replace(partial, cached)
+    return read_output(cached)
@@ -3,10 +3,37 @@
 Examine the Excel file structure to identify column names.
 """
 
+import re
 import pandas as pd
 import sys
 from pathlib import Path
 
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Keywords that suggest a column holds lead names
+NAME_KEYWORDS = ['cliente', 'name', 'nome', 'customer', 'lead']
+NAME_RE = re.compile('|'.join(map(re.escape, NAME_KEYWORDS)), re.IGNORECASE)
+
+def to_arrow_table(df):
+    """Convert the DataFrame to an Arrow table, or None if that is not possible."""
+    if not PYARROW_AVAILABLE:
+        return None
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns cannot be converted; use pandas instead
+        return None
+
+def sample_values(df, table, col, n):
+    """Return the first n non-null values of a column."""
+    if table is not None:
+        return table.column(str(col)).drop_null().slice(0, n).to_pylist()
+    return df[col].dropna().head(n).tolist()
+
 def examine_excel_file():
     """Examine the Excel file structure."""
     excel_file = "data/input/leads_vinteseismaio.xlsx"
@@ -18,6 +45,7 @@ def examine_excel_file():
     try:
         # Read Excel file
         df = pd.read_excel(excel_file)
+        table = to_arrow_table(df)
         
         print("📊 EXCEL FILE ANALYSIS")
         print("=" * 50)
@@ -38,18 +66,14 @@ def examine_excel_file():
         
         print(f"\n📊 SAMPLE DATA FOR EACH COLUMN:")
         for col in df.columns:
-            sample_values = df[col].dropna().head(3).tolist()
-            print(f"  {col}: {sample_values}")
+            print(f"  {col}: {sample_values(df, table, col, 3)}")
         
         # Check for potential name columns
         print(f"\n🔍 POTENTIAL NAME COLUMNS:")
-        name_keywords = ['cliente', 'name', 'nome', 'customer', 'lead']
         for col in df.columns:
-            col_lower = col.lower()
-            if any(keyword in col_lower for keyword in name_keywords):
+            if NAME_RE.search(str(col)):
                 print(f"  ✅ '{col}' - likely contains names")
-                sample_values = df[col].dropna().head(5).tolist()
-                print(f"     Sample values: {sample_values}")
+                print(f"     Sample values: {sample_values(df, table, col, 5)}")
         
     except Exception as e:
         print(f"❌ Error reading Excel file: {e}")
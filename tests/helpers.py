@@ -0,0 +1,118 @@
+"""
+Helpers shared by the test modules.
+
+pandas is imported where it is used, so importing this module stays cheap
+for scripts that never touch the sample files.
+"""
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from importlib.util import find_spec
+from itertools import islice
+
+PYARROW_AVAILABLE = find_spec("pyarrow") is not None
+CALAMINE_AVAILABLE = find_spec("python_calamine") is not None
+
+# Column headers of the sample leads spreadsheet
+EXCEL_COLUMNS = [
+    "Lead",
+    "Tel. Fixo",
+    "Celular",
+    "E-mail",
+    "Descrição",
+    "Volume Aproximado",
+    "Tipo",
+    "Estado",
+    "Atribuir",
+]
+
+
+def read_excel(path, **kwargs):
+    """Parse a spreadsheet, preferring the native calamine reader over openpyxl."""
+    import pandas as pd
+
+    if CALAMINE_AVAILABLE:
+        try:
+            return pd.read_excel(path, engine="calamine", **kwargs)
+        except (ValueError, ImportError):
+            # pandas < 2.2 does not know the calamine engine
+            pass
+    return pd.read_excel(path, **kwargs)
+
+
+def read_output(path):
+    """Parse a processed CSV into Arrow-backed columns when pyarrow is available."""
+    import pandas as pd
+
+    if PYARROW_AVAILABLE:
+        try:
+            return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+        except TypeError:
+            # pandas < 2.0 has no dtype_backend
+            pass
+    return pd.read_csv(path)
+
+
+def first_valid(series, n):
+    """Return the first n non-null values, stopping as soon as they are found."""
+    import pandas as pd
+
+    return list(islice((value for value in series if pd.notna(value)), n))
+
+
+def read_leads(path):
+    """Parse only the known lead columns of the spreadsheet."""
+    return read_excel(path, usecols=lambda column: column in EXCEL_COLUMNS)
+
+
+class _ThreadOutput:
+    """Stand-in for sys.stdout that keeps each thread's buffered output apart."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffers = {}
+
+    def write(self, text):
+        buffer = self.buffers.get(threading.get_ident())
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        if threading.get_ident() not in self.buffers:
+            self.stream.flush()
+
+
+_stdout_lock = threading.Lock()
+
+
+@contextmanager
+def buffered_stdout(emit=True):
+    """Collect the current thread's prints and write them out in one go.
+
+    Nested use shares the outer buffer. With emit=False the buffer is handed
+    to the caller, who decides when to write it. Meant for the script entry
+    points; under pytest, output capture already does this.
+    """
+    ident = threading.get_ident()
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadOutput):
+            sys.stdout = _ThreadOutput(sys.stdout)
+        output = sys.stdout
+        outer = output.buffers.get(ident)
+        if outer is None:
+            output.buffers[ident] = io.StringIO()
+        buffer = output.buffers[ident]
+    if outer is not None:
+        yield buffer
+        return
+    try:
+        yield buffer
+    finally:
+        with _stdout_lock:
+            del output.buffers[ident]
+            if not output.buffers:
+                sys.stdout = output.stream
+        if emit:
+            output.stream.write(buffer.getvalue())
+            output.stream.flush()
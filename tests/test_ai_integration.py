@@ -7,17 +7,51 @@ Tests AI integration, field mapping, and data validation capabilities.
 import os
 import sys
 import json
-import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
-def create_test_data():
-    """Create sample test data for AI processing."""
+# pandas and pyarrow are imported where they are used so that --quick,
+# which never touches the sample files, does not pay for loading them
+try:
+    from .helpers import PYARROW_AVAILABLE, buffered_stdout
+except ImportError:
+    # Run directly as a script
+    from helpers import PYARROW_AVAILABLE, buffered_stdout
+
+def write_test_file(data, csv_file, delimiter=','):
+    """Write sample data as CSV and, with pyarrow, as a Parquet companion."""
+    if not PYARROW_AVAILABLE:
+        import pandas as pd
+        pd.DataFrame(data).to_csv(csv_file, sep=delimiter, index=False, encoding='utf-8')
+        return
+
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    table = pa.table(data)
+    with open(csv_file, 'wb') as f:
+        # Arrow always quotes the header, so write it by hand to match to_csv
+        f.write((delimiter.join(table.column_names) + '\n').encode('utf-8'))
+        pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(
+            include_header=False, delimiter=delimiter, quoting_style='none'))
+    pq.write_table(table, csv_file.with_suffix('.parquet'), compression='snappy')
+
+def create_test_data(test_dir='test_data'):
+    """Create sample test data for AI processing.
+
+    CSV files are always written since format detection exercises the CSV
+    path; when pyarrow is installed a Parquet companion is written next to
+    each one so the data can be read back without re-parsing text.
+    """
     print("📝 Creating test data...")
     
     # Create test data directory
-    test_dir = Path('test_data')
-    test_dir.mkdir(exist_ok=True)
+    test_dir = Path(test_dir)
+    test_dir.mkdir(parents=True, exist_ok=True)
     
     # Sample raw format data (Portuguese)
     raw_data = {
@@ -30,9 +64,8 @@ def create_test_data():
     }
     
     # Save raw format test file
-    raw_df = pd.DataFrame(raw_data)
     raw_file = test_dir / 'test_raw_format.csv'
-    raw_df.to_csv(raw_file, sep=';', index=False, encoding='utf-8')
+    write_test_file(raw_data, raw_file, delimiter=';')
     print(f"✅ Created: {raw_file}")
     
     # Sample mixed format data (Multi-language)
@@ -45,96 +78,154 @@ def create_test_data():
         'Notes': ['High value client', 'New prospect', 'Returning customer']
     }
     
-    mixed_df = pd.DataFrame(mixed_data)
     mixed_file = test_dir / 'test_mixed_format.csv'
-    mixed_df.to_csv(mixed_file, index=False, encoding='utf-8')
+    write_test_file(mixed_data, mixed_file)
     print(f"✅ Created: {mixed_file}")
     
     return [str(raw_file), str(mixed_file)]
 
+@pytest.fixture
+def test_files(tmp_path):
+    """Sample files written to a temporary directory."""
+    return create_test_data(tmp_path / 'test_data')
+
 def test_ai_field_mapper():
     """Test AI field mapping functionality."""
     print("\n🧪 Testing AI Field Mapper...")
     
-    try:
-        from ai_field_mapper import AIFieldMapper, FieldMapping
-        
-        # Test with AI disabled (to avoid API calls in testing)
-        config = {"ai_processing": {"enabled": False, "confidence_threshold": 80.0}}
-        mapper = AIFieldMapper(config)
-        
-        # Test column analysis
-        test_columns = ['Cliente', 'Telefone', 'E-mail', 'Volume Aproximado']
-        mappings = mapper.analyze_columns(test_columns)
-        
-        print(f"✅ Field mapper initialized")
-        print(f"✅ Analyzed {len(test_columns)} columns")
-        print(f"✅ Generated {len(mappings)} mappings")
-        
-        # Display mappings
-        for mapping in mappings:
-            print(f"   {mapping.source_field} → {mapping.target_field} ({mapping.confidence}%)")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ AI Field Mapper test failed: {e}")
-        return False
+    from ai_field_mapper import AIFieldMapper
+    
+    # Test with AI disabled (to avoid API calls in testing)
+    config = {"ai_processing": {"enabled": False, "confidence_threshold": 80.0}}
+    mapper = AIFieldMapper(config)
+    
+    # Test column analysis
+    test_columns = ['Cliente', 'Telefone', 'E-mail', 'Volume Aproximado']
+    mappings = mapper.analyze_columns(test_columns)
+    
+    print(f"✅ Field mapper initialized")
+    print(f"✅ Analyzed {len(test_columns)} columns")
+    print(f"✅ Generated {len(mappings)} mappings")
+    
+    # Display mappings
+    for mapping in mappings:
+        print(f"   {mapping.source_field} → {mapping.target_field} ({mapping.confidence}%)")
+    
+    targets = {m.source_field: m.target_field for m in mappings}
+    assert targets == {
+        'Cliente': 'Last Name',
+        'Telefone': 'Phone',
+        'E-mail': 'Email',
+        'Volume Aproximado': 'Patrimônio Financeiro',
+    }
 
 def test_ai_processor():
     """Test AI-enhanced processor initialization."""
     print("\n🧪 Testing AI-Enhanced Processor...")
     
+    from master_leads_processor_ai import AIEnhancedLeadsProcessor
+    
+    # Test initialization
+    processor = AIEnhancedLeadsProcessor()
+    
+    print(f"✅ AI processor initialized")
+    print(f"✅ AI enabled: {processor.ai_mapper.ai_enabled}")
+    print(f"✅ Confidence threshold: {processor.ai_mapper.confidence_threshold}")
+    
+    assert processor.ai_mapper.confidence_threshold == \
+        processor.config['ai_processing']['confidence_threshold']
+
+def test_config_file_parsed_once(tmp_path):
+    """Processors built from the same unchanged config file share one parse."""
+    from master_leads_processor_ai import AIEnhancedLeadsProcessor, _read_config_file
+
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({"file_formats": {"raw_format": {"separator": ";"}}}), encoding='utf-8')
+
+    first = AIEnhancedLeadsProcessor(config_file=str(config_file))
+    hits = _read_config_file.cache_info().hits
+    second = AIEnhancedLeadsProcessor(config_file=str(config_file))
+    assert _read_config_file.cache_info().hits == hits + 1
+
+    # Each processor still owns its configuration
+    first.config['file_formats']['raw_format']['separator'] = ','
+    assert second.config['file_formats']['raw_format']['separator'] == ';'
+
+@lru_cache(maxsize=1)
+def _detect_processor():
+    """Processor with AI disabled, shared by every format detection."""
+    from master_leads_processor_ai import AIEnhancedLeadsProcessor
+    processor = AIEnhancedLeadsProcessor()
+    processor.config['ai_processing']['enabled'] = False
+    processor.ai_mapper.ai_enabled = False
+    return processor
+
+@lru_cache(maxsize=32)
+def _cached_detect(path, mtime_ns, size):
+    """Memoized format detection; the stat fields invalidate stale entries."""
+    return _detect_processor().detect_file_format_ai(path)
+
+def detect_format_cached(path):
+    """Detect a test file's format, reusing earlier results for unchanged files."""
+    stat = os.stat(path)
+    return _cached_detect(str(path), stat.st_mtime_ns, stat.st_size)
+
+def read_test_csv(test_file, separator):
+    """Read a test CSV with the pyarrow engine when available."""
+    import pandas as pd
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(test_file, sep=separator, encoding='utf-8')
     try:
-        from master_leads_processor_ai import AIEnhancedLeadsProcessor
-        
-        # Test initialization
-        processor = AIEnhancedLeadsProcessor()
-        
-        print(f"✅ AI processor initialized")
-        print(f"✅ AI enabled: {processor.ai_mapper.ai_enabled}")
-        print(f"✅ Confidence threshold: {processor.ai_mapper.confidence_threshold}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ AI Processor test failed: {e}")
-        return False
+        return pd.read_csv(test_file, sep=separator, encoding='utf-8',
+                           engine='pyarrow', dtype_backend='pyarrow')
+    except TypeError:
+        # dtype_backend requires pandas >= 2.0
+        return pd.read_csv(test_file, sep=separator, encoding='utf-8', engine='pyarrow')
 
 def test_file_processing(test_files):
     """Test file processing with AI disabled."""
     print("\n🧪 Testing File Processing (AI disabled)...")
     
-    try:
-        from master_leads_processor_ai import AIEnhancedLeadsProcessor
-        
-        # Initialize with AI disabled for testing
-        config = {"ai_processing": {"enabled": False}}
-        processor = AIEnhancedLeadsProcessor()
-        processor.config.update(config)
-        processor.ai_mapper.ai_enabled = False
+    import pandas as pd
+    
+    for test_file in test_files:
+        print(f"\n📄 Processing: {Path(test_file).name}")
         
-        for test_file in test_files:
-            print(f"\n📄 Processing: {Path(test_file).name}")
-            
-            # Test format detection
-            file_format, separator, sample_data = processor.detect_file_format_ai(test_file)
-            print(f"   Format detected: {file_format}")
-            print(f"   Separator: '{separator}'")
-            print(f"   Sample data columns: {len(sample_data)}")
-            
-            # Test file reading
-            df = pd.read_csv(test_file, sep=separator, encoding='utf-8')
-            print(f"   Records read: {len(df)}")
-            print(f"   Columns: {list(df.columns)}")
+        # Test format detection
+        file_format, separator, sample_data = detect_format_cached(test_file)
+        print(f"   Format detected: {file_format}")
+        print(f"   Separator: '{separator}'")
+        print(f"   Sample data columns: {len(sample_data)}")
+        assert sample_data, f"No sample data detected in {test_file}"
         
-        print("✅ File processing test completed")
-        return True
+        # Test file reading
+        df = read_test_csv(test_file, separator)
+        print(f"   Records read: {len(df)}")
+        print(f"   Columns: {list(df.columns)}")
+        assert len(df) == 3, f"Expected 3 records in {test_file}, read {len(df)}"
         
-    except Exception as e:
-        print(f"❌ File processing test failed: {e}")
-        return False
+        # Read the Parquet companion, if one was written
+        parquet_file = Path(test_file).with_suffix('.parquet')
+        if parquet_file.exists():
+            df_parquet = pd.read_parquet(parquet_file)
+            print(f"   Parquet records read: {len(df_parquet)}")
+            assert len(df_parquet) == len(df), "Parquet record count does not match the CSV"
+            assert list(df_parquet.columns) == list(df.columns), "Parquet columns do not match the CSV"
+    
+    print("✅ File processing test completed")
+
+_openai_client = None
 
+def _get_openai_client(api_key):
+    """Return a shared OpenAI client, importing openai on first use."""
+    global _openai_client
+    if _openai_client is None:
+        import openai
+        # Fail fast instead of stalling the run on a dead network
+        _openai_client = openai.OpenAI(api_key=api_key, timeout=5)
+    return _openai_client
+
+@pytest.mark.integration
 def test_openai_connection():
     """Test OpenAI API connection (if API key is available)."""
     print("\n🧪 Testing OpenAI Connection...")
@@ -142,32 +233,19 @@ def test_openai_connection():
     # Check if API key is available
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
-        print("⚠️  OpenAI API key not found - skipping connection test")
-        return True
+        pytest.skip("OpenAI API key not found - skipping connection test")
     
     try:
-        import openai
-        openai.api_key = api_key
-        
-        # Test with a minimal API call
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": "Test connection - respond with 'OK'"}],
-            max_tokens=5,
-            temperature=0
-        )
-        
-        if response.choices[0].message.content.strip().upper() == 'OK':
-            print("✅ OpenAI API connection successful")
-            return True
-        else:
-            print("⚠️  OpenAI API responded but with unexpected content")
-            return True
-            
+        # Listing models only checks the key, with no completion tokens spent
+        models = _get_openai_client(api_key).models.list()
     except Exception as e:
-        print(f"❌ OpenAI API connection failed: {e}")
-        print("   This may be due to rate limits, invalid API key, or network issues")
-        return False
+        pytest.fail(f"OpenAI API connection failed: {e} "
+                    "(this may be due to rate limits, invalid API key, or network issues)")
+    
+    if any(model.id for model in models.data):
+        print("✅ OpenAI API connection successful")
+    else:
+        print("⚠️  OpenAI API responded but listed no models")
 
 def run_comprehensive_test():
     """Run a comprehensive test of the AI system."""
@@ -185,24 +263,45 @@ def run_comprehensive_test():
         test_results.append(("Test Data Creation", False))
         return test_results
     
-    # Test AI field mapper
-    result = test_ai_field_mapper()
-    test_results.append(("AI Field Mapper", result))
+    # The remaining tests are independent, so run them side by side
+    # (the OpenAI call overlaps the local ones) and report in this order
+    tests = [
+        ("AI Field Mapper", test_ai_field_mapper, ()),
+        ("AI Processor", test_ai_processor, ()),
+        ("File Processing", test_file_processing, (test_files,)),
+        ("OpenAI Connection", test_openai_connection, ()),
+    ]
     
-    # Test AI processor
-    result = test_ai_processor()
-    test_results.append(("AI Processor", result))
+    def run(test, args):
+        with buffered_stdout(emit=False) as buffer:
+            result = run_test(test, *args)
+        return result, buffer.getvalue()
     
-    # Test file processing
-    result = test_file_processing(test_files)
-    test_results.append(("File Processing", result))
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = [executor.submit(run, test, args) for _, test, args in tests]
+        outcomes = [future.result() for future in futures]
     
-    # Test OpenAI connection (optional)
-    result = test_openai_connection()
-    test_results.append(("OpenAI Connection", result))
+    for (name, _, _), (result, text) in zip(tests, outcomes):
+        sys.stdout.write(text)
+        test_results.append((name, result))
     
     return test_results
 
+def run_test(test, *args):
+    """Run one test function outside pytest and report whether it passed.
+
+    A skip counts as a pass, as it did before the tests raised on failure.
+    """
+    try:
+        test(*args)
+    except pytest.skip.Exception as e:
+        print(f"⚠️  {e}")
+    except Exception as e:
+        print(f"❌ {test.__name__} failed: {e}")
+        return False
+    return True
+
+@buffered_stdout()
 def print_test_summary(test_results):
     """Print test summary."""
     print("\n" + "=" * 60)
@@ -247,8 +346,8 @@ def main():
         print("🚀 Quick AI System Test")
         print("=" * 30)
         
-        result1 = test_ai_field_mapper()
-        result2 = test_ai_processor()
+        result1 = run_test(test_ai_field_mapper)
+        result2 = run_test(test_ai_processor)
         
         if result1 and result2:
             print("\n✅ Quick test passed - AI system components are working")
@@ -260,4 +359,6 @@ def main():
         print_test_summary(test_results)
 
 if __name__ == "__main__":
+    # Under pytest conftest.py puts core/ on the path; do the same here
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'core'))
     main()
@@ -4,7 +4,30 @@ Test script to debug the description mapping issue.
 """
 
 import re
+import sys
 import unicodedata
+from pathlib import Path
+
+# Under pytest conftest.py puts core/ on the path; do the same when run directly
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'core'))
+
+from ai_field_mapper import AIFieldMapper
+
+# Candidate patterns for the 'Descrição' column, compiled once
+DESCRIPTION_PATTERNS = [re.compile(p) for p in (
+    r'descri[çc]ao',
+    r'descri[çc]ão',
+    r'descri[çc][aã]o',
+    r'descri.*ao',
+    r'descri.*ão',
+    r'descri.*[aã]o',
+    r'descrição',
+    r'descricao'
+)]
+
+# Improved pattern that handles Unicode better
+IMPROVED_PATTERN = re.compile(r'descri[çc][aã]o|description|obs|observa[çc][aã]o')
 
 def test_regex_patterns():
     """Test regex patterns with Portuguese characters."""
@@ -19,22 +42,11 @@ def test_regex_patterns():
     print(f"Unicode representation: {[ord(c) for c in test_string_lower]}")
     
     # Test different regex patterns
-    patterns = [
-        r'descri[çc]ao',
-        r'descri[çc]ão',
-        r'descri[çc][aã]o',
-        r'descri.*ao',
-        r'descri.*ão',
-        r'descri.*[aã]o',
-        r'descrição',
-        r'descricao'
-    ]
-    
     print(f"\n📋 Testing patterns against '{test_string_lower}':")
-    for pattern in patterns:
-        match = re.search(pattern, test_string_lower)
+    for pattern in DESCRIPTION_PATTERNS:
+        match = pattern.search(test_string_lower)
         status = "✅" if match else "❌"
-        print(f"  {status} {pattern}")
+        print(f"  {status} {pattern.pattern}")
     
     # Test normalization
     normalized = unicodedata.normalize('NFD', test_string_lower)
@@ -48,10 +60,6 @@ def test_current_mapping():
     print(f"\n🧪 Testing current mapping logic...")
     
     try:
-        import sys
-        sys.path.append('core')
-        from ai_field_mapper import AIFieldMapper
-        
         # Initialize mapper
         config = {"ai_processing": {"enabled": False, "confidence_threshold": 80.0}}
         mapper = AIFieldMapper(config)
@@ -75,15 +83,12 @@ def test_improved_pattern():
     """Test an improved regex pattern."""
     print(f"\n🧪 Testing improved regex pattern...")
     
-    # Improved pattern that handles Unicode better
-    improved_pattern = r'descri[çc][aã]o|description|obs|observa[çc][aã]o'
-    
     test_strings = ['descrição', 'descricao', 'description', 'Descrição', 'DESCRIÇÃO']
     
-    print(f"Pattern: {improved_pattern}")
+    print(f"Pattern: {IMPROVED_PATTERN.pattern}")
     for test_str in test_strings:
         test_lower = test_str.lower()
-        match = re.search(improved_pattern, test_lower)
+        match = IMPROVED_PATTERN.search(test_lower)
         status = "✅" if match else "❌"
         print(f"  {status} '{test_str}' (lowercase: '{test_lower}')")
     
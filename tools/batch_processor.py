@@ -12,10 +12,18 @@ Examples:
 """
 
 import os
+import io
+import re
 import sys
+import csv
+import logging
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout, redirect_stderr
 from pathlib import Path
-from master_leads_processor import LeadsProcessor
+
+# File name keywords of already processed files and backups, compiled once
+SKIP_KEYWORDS_PATTERN = re.compile(r'processed|backup|output', re.IGNORECASE)
 
 def find_csv_files(directory: str) -> list:
     """Find all CSV files in the specified directory."""
@@ -26,15 +34,67 @@ def find_csv_files(directory: str) -> list:
         print(f"❌ Directory not found: {directory}")
         return csv_files
     
-    # Find all CSV files
-    for file_path in directory_path.glob("*.csv"):
-        # Skip already processed files and backups
-        if any(keyword in file_path.name.lower() for keyword in ['processed', 'backup', 'output']):
-            continue
-        csv_files.append(str(file_path))
+    # Find all CSV files in one directory read, skipping processed files and backups
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.csv') or not entry.is_file():
+                continue
+            if SKIP_KEYWORDS_PATTERN.search(entry.name):
+                continue
+            csv_files.append(str(directory_path / entry.name))
     
     return csv_files
 
+def count_csv_records(csv_file: str, encoding: str = 'utf-8') -> int:
+    """Count the data rows of a CSV file without loading it into a DataFrame."""
+    newlines = 0
+    quoted = False
+    last = b'\n'
+    with open(csv_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            newlines += chunk.count(b'\n')
+            quoted = quoted or b'"' in chunk
+            last = chunk[-1:]
+    
+    if quoted:
+        # Quoted fields may hold line breaks, so let the csv module find the rows
+        with open(csv_file, 'r', encoding=encoding, newline='') as f:
+            return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+    
+    # A last line without a trailing newline is still a record; minus the header
+    return max(newlines + (last != b'\n') - 1, 0)
+
+def _process_one(file_path: str, config_file: str = None) -> tuple:
+    """
+    Process a single file in a worker process.
+
+    Returns (output_file, record_count, log, error). Everything the worker
+    would print is collected in log instead, so the parent can show each
+    file's report in one piece; error is None on success.
+    """
+    # Imported here so --help, --dry-run and empty directories never load pandas
+    from master_leads_processor import LeadsProcessor
+    
+    log = io.StringIO()
+    with redirect_stdout(log), redirect_stderr(log):
+        # The console log handler is bound to the stdout of the worker's first
+        # file; in a reused worker, point it at this file's log instead
+        handlers = [h for h in logging.getLogger().handlers if type(h) is logging.StreamHandler]
+        streams = [handler.setStream(log) for handler in handlers]
+        try:
+            # Each worker builds its own processor, so nothing has to be pickled across
+            processor = LeadsProcessor(config_file=config_file)
+            output_file = processor.process_file(file_path)
+            record_count = count_csv_records(output_file, processor.config["output_encoding"])
+        except Exception as e:
+            return None, 0, log.getvalue(), str(e)
+        finally:
+            for handler, stream in zip(handlers, streams):
+                if stream is not None:
+                    handler.setStream(stream)
+    
+    return output_file, record_count, log.getvalue(), None
+
 def process_files_batch(files: list, config_file: str = None) -> dict:
     """Process multiple files in batch mode."""
     results = {
@@ -56,42 +116,41 @@ def process_files_batch(files: list, config_file: str = None) -> dict:
     print("STARTING BATCH PROCESSING")
     print("="*60)
     
-    # Initialize processor
-    try:
-        processor = LeadsProcessor(config_file=config_file)
-    except Exception as e:
-        print(f"❌ Failed to initialize processor: {e}")
-        return results
-    
-    # Process each file
-    for i, file_path in enumerate(files, 1):
-        print(f"\n📄 Processing file {i}/{len(files)}: {Path(file_path).name}")
-        print("-" * 40)
+    # Files are independent, so process them side by side in worker processes
+    max_workers = min(len(files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_process_one, file_path, config_file): file_path for file_path in files}
         
-        try:
-            # Process the file
-            output_file = processor.process_file(file_path)
+        for i, future in enumerate(as_completed(futures), 1):
+            file_path = futures[future]
+            print(f"\n📄 Finished file {i}/{len(files)}: {Path(file_path).name}")
+            print("-" * 40)
             
-            # Count records in output file
-            import pandas as pd
-            df = pd.read_csv(output_file)
-            record_count = len(df)
+            try:
+                output_file, record_count, log, error = future.result()
+            except Exception as e:
+                # The worker itself failed, e.g. it was killed
+                output_file, record_count, log, error = None, 0, '', str(e)
             
-            results['successful'].append({
-                'input_file': file_path,
-                'output_file': output_file,
-                'records': record_count
-            })
-            results['total_records'] += record_count
+            # Each file's report is printed in one piece as it completes
+            if log:
+                print(log, end='' if log.endswith('\n') else '\n')
             
-            print(f"✅ Successfully processed: {record_count} records")
-            
-        except Exception as e:
-            print(f"❌ Failed to process {file_path}: {e}")
-            results['failed'].append({
-                'input_file': file_path,
-                'error': str(e)
-            })
+            if error is None:
+                results['successful'].append({
+                    'input_file': file_path,
+                    'output_file': output_file,
+                    'records': record_count
+                })
+                results['total_records'] += record_count
+                
+                print(f"✅ Successfully processed: {record_count} records")
+            else:
+                print(f"❌ Failed to process {file_path}: {error}")
+                results['failed'].append({
+                    'input_file': file_path,
+                    'error': error
+                })
     
     return results
 
@@ -76,11 +76,9 @@ class DataValidator:
             'file_size_mb': round(Path(file_path).stat().st_size / (1024*1024), 2)
         }
 
-        # Check required columns
-        missing_required = []
-        for col in self.config['required_columns']:
-            if col not in df.columns:
-                missing_required.append(col)
+        # Check required columns against a set of the frame's columns
+        columns = set(df.columns)
+        missing_required = [col for col in self.config['required_columns'] if col not in columns]
 
         if missing_required:
             self.validation_results['errors'].append(
@@ -88,7 +86,7 @@ class DataValidator:
             )
 
         # Check for unexpected columns
-        expected_cols = self.config['required_columns'] + self.config['optional_columns']
+        expected_cols = set(self.config['required_columns']) | set(self.config['optional_columns'])
         unexpected_cols = [col for col in df.columns if col not in expected_cols]
 
         if unexpected_cols:
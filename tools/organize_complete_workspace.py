@@ -10,6 +10,14 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+def move_file(source, destination):
+    """Move um arquivo com um único rename, usando shutil.move só quando necessário."""
+    try:
+        os.rename(source, destination)
+    except OSError:
+        # Outro sistema de arquivos ou, no Windows, destino já existente
+        shutil.move(source, destination)
+
 def create_clean_structure():
     """Cria a estrutura de pastas limpa e organizada."""
     print("📁 Criando estrutura de pastas organizada...")
@@ -43,7 +51,7 @@ def organize_core_files():
     
     for file in core_files:
         if Path(file).exists():
-            shutil.move(file, f'core/{file}')
+            move_file(file, f'core/{file}')
             print(f"✓ Movido: {file} → core/")
 
 def organize_tools():
@@ -61,7 +69,7 @@ def organize_tools():
     
     for file in tool_files:
         if Path(file).exists():
-            shutil.move(file, f'tools/{file}')
+            move_file(file, f'tools/{file}')
             print(f"✓ Movido: {file} → tools/")
 
 def organize_tests():
@@ -75,7 +83,7 @@ def organize_tests():
     
     for file in test_files:
         if Path(file).exists():
-            shutil.move(file, f'tests/{file}')
+            move_file(file, f'tests/{file}')
             print(f"✓ Movido: {file} → tests/")
 
 def organize_documentation():
@@ -90,7 +98,7 @@ def organize_documentation():
     
     for file in doc_files:
         if Path(file).exists():
-            shutil.move(file, f'docs/{file}')
+            move_file(file, f'docs/{file}')
             print(f"✓ Movido: {file} → docs/")
 
 def organize_config_files():
@@ -109,7 +117,7 @@ def organize_config_files():
             if file == 'requirements.txt':
                 # Manter requirements.txt na raiz para facilidade
                 continue
-            shutil.move(file, f'config/{file}')
+            move_file(file, f'config/{file}')
             print(f"✓ Movido: {file} → config/")
 
 def organize_data_files():
@@ -123,7 +131,7 @@ def organize_data_files():
     
     for file in input_files:
         if Path(file).exists():
-            shutil.move(file, f'data/input/{file}')
+            move_file(file, f'data/input/{file}')
             print(f"✓ Movido: {file} → data/input/")
     
     # Arquivos de trabalho (manter na raiz para facilidade)